@@ -1,21 +1,278 @@
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, ORJSONResponse
 from pydantic import BaseModel, HttpUrl
-import subprocess
+from starlette.background import BackgroundTask
+from youtube_transcript_api import YouTubeTranscriptApi, CouldNotRetrieveTranscript
+import aiohttp
+import asyncio
+import cachetools
+import hashlib
+import logging
+import orjson
 import os
+import re
+import yt_dlp
 import uuid
 import time
 import shutil
 import datetime
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One connection pool for the whole app: keep-alive + TLS session reuse
+    # instead of a fresh handshake to googleapis.com per request.
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=200, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(total=10),
+    )
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    app.state.batcher = asyncio.create_task(_batch_worker(app))
+    app.state.sweeper = asyncio.create_task(_sweep_downloads())
+    yield
+    app.state.batcher.cancel()
+    app.state.sweeper.cancel()
+    await app.state.http.close()
+
 app = FastAPI(
     title="YTLarge-GPT",
     version="1.2.0",
-    description="YouTube metadata API using yt-dlp — supports transcript, mp3, download, and analysis"
+    description="YouTube metadata API using yt-dlp — supports transcript, mp3, download, and analysis",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 class AnalyzeRequest(BaseModel):
     url: HttpUrl
 
+class BatchAnalyzeRequest(BaseModel):
+    urls: list[HttpUrl]
+
+class ClipSegment(BaseModel):
+    start: float
+    end: float
+
+class ClipRequest(BaseModel):
+    url: HttpUrl
+    segments: list[ClipSegment]
+
+class VideoMetadata(BaseModel):
+    title: str
+    description: str
+    duration: str
+    view_count: int
+    like_count: int
+    channel_name: str
+    upload_date: str
+
+class AnalyzeResponse(BaseModel):
+    analysis: str
+    metadata: VideoMetadata
+    processing_time: float
+
+class BatchVideoResult(BaseModel):
+    video_id: str | None = None
+    url: str | None = None
+    metadata: VideoMetadata | None = None
+    error: str | None = None
+
+class BatchAnalyzeResponse(BaseModel):
+    videos: list[BatchVideoResult]
+    processing_time: float
+
+class FullAnalyzeResponse(BaseModel):
+    analysis: str
+    metadata: VideoMetadata
+    transcript: list[str] | None = None
+    processing_time: float
+
+DOWNLOAD_DIR = "downloads"
+
+# One regex match instead of chained str.split calls; also handles
+# youtu.be/<id>, /shorts/<id> and /embed/<id> forms.
+_YT_ID = re.compile(r"(?:v=|youtu\.be/|/shorts/|/embed/)([A-Za-z0-9_-]{11})")
+
+def extract_video_id(url: str) -> str:
+    m = _YT_ID.search(url)
+    if not m:
+        raise HTTPException(400, detail="Could not extract video ID from URL.")
+    return m.group(1)
+
+# Temp files are removed right after their response is flushed; the sweeper
+# catches anything orphaned by crashes or cancelled requests so disk usage
+# stays bounded to in-flight work.
+_SWEEP_INTERVAL = 60
+_SWEEP_MAX_AGE = 900
+
+def _cleanup_files(paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+async def _sweep_downloads():
+    while True:
+        await asyncio.sleep(_SWEEP_INTERVAL)
+        cutoff = time.time() - _SWEEP_MAX_AGE
+        try:
+            entries = list(os.scandir(DOWNLOAD_DIR))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+# Video metadata changes slowly and every API call costs quota, so serve
+# repeat lookups from RAM. ETags outlive the TTL: a revalidation that comes
+# back 304 costs 1 quota unit instead of a full fetch.
+_meta_cache = cachetools.TTLCache(maxsize=10_000, ttl=3600)
+_etag_cache = cachetools.LRUCache(maxsize=10_000)
+_meta_locks = defaultdict(asyncio.Lock)
+
+# videos.list takes up to 50 comma-separated IDs at the same 1-unit base
+# cost, so concurrent lookups are coalesced: callers park a Future on the
+# queue and a background worker drains up to 50 IDs (or waits 20ms) per
+# upstream request.
+_BATCH_SIZE = 50
+_BATCH_WINDOW = 0.02
+_batch_queue: asyncio.Queue = asyncio.Queue()
+
+_VIDEOS_API = "https://www.googleapis.com/youtube/v3/videos"
+# Only the fields _item_to_meta reads, plus id for matching items back to
+# callers: a few hundred bytes instead of the full three-part payload.
+_VIDEOS_FIELDS = (
+    "items(id,snippet(title,description,channelTitle,publishedAt),"
+    "statistics(viewCount,likeCount),contentDetails(duration))"
+)
+
+def _item_to_meta(item):
+    # The fields mask drops an object entirely when none of its requested
+    # subfields exist, so every level needs a default.
+    snippet = item.get("snippet", {})
+    stats = item.get("statistics", {})
+    return {
+        "title": snippet.get("title", ""),
+        "description": snippet.get("description", ""),
+        "duration": item.get("contentDetails", {}).get("duration", ""),
+        "view_count": int(stats.get("viewCount", 0)),
+        "like_count": int(stats.get("likeCount", 0)),
+        "channel_name": snippet.get("channelTitle", ""),
+        "upload_date": snippet.get("publishedAt", "")[:10],
+    }
+
+async def _batch_worker(app: FastAPI):
+    while True:
+        video_id, fut = await _batch_queue.get()
+        batch = {video_id: [fut]}
+        deadline = time.monotonic() + _BATCH_WINDOW
+        while len(batch) < _BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                vid, f = await asyncio.wait_for(_batch_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.setdefault(vid, []).append(f)
+        # The worker must survive anything _run_batch throws (malformed
+        # body, unexpected payload shape, ...): if it died, every future
+        # queued afterwards would hang forever.
+        try:
+            await _run_batch(app, batch)
+        except Exception:
+            logger.exception("metadata batch failed")
+            _resolve(batch, HTTPException(status_code=502, detail="YouTube metadata lookup failed."))
+
+def _resolve(batch, result):
+    for futs in batch.values():
+        for fut in futs:
+            if not fut.done():
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+async def _run_batch(app: FastAPI, batch):
+    api_key = os.getenv("YOUTUBE_API_KEY")
+    if not api_key:
+        _resolve(batch, HTTPException(status_code=500, detail="Missing YouTube API key."))
+        return
+    params = {
+        "part": "snippet,statistics,contentDetails",
+        "id": ",".join(batch),
+        "fields": _VIDEOS_FIELDS,
+        "key": api_key,
+    }
+    # If-None-Match only lines up with a stored ETag for single-ID requests;
+    # multi-ID batches skip revalidation.
+    headers = {}
+    stale = _etag_cache.get(next(iter(batch))) if len(batch) == 1 else None
+    if stale:
+        headers["If-None-Match"] = stale[0]
+    try:
+        async with app.state.http.get(_VIDEOS_API, params=params, headers=headers) as r:
+            status = r.status
+            resp_etag = r.headers.get("ETag")
+            body = await r.read() if status == 200 else b""
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        _resolve(batch, HTTPException(status_code=502, detail=f"YouTube API unreachable: {exc}"))
+        return
+    if status == 304:
+        _resolve(batch, stale[1])
+        return
+    if status != 200:
+        _resolve(batch, HTTPException(400, "Invalid YouTube URL or quota exceeded"))
+        return
+    data = orjson.loads(body)
+    items = {item["id"]: item for item in data.get("items", [])}
+    for vid, futs in batch.items():
+        item = items.get(vid)
+        if item is None:
+            _resolve({vid: futs}, HTTPException(400, "Video not found"))
+            continue
+        meta = _item_to_meta(item)
+        if len(batch) == 1 and resp_etag:
+            _etag_cache[vid] = (resp_etag, meta)
+        _resolve({vid: futs}, meta)
+
+_META_TIMEOUT = 30
+
+async def _fetch_meta(video_id: str):
+    fut = asyncio.get_running_loop().create_future()
+    _batch_queue.put_nowait((video_id, fut))
+    # Backstop so a wedged worker can never hang callers indefinitely.
+    try:
+        return await asyncio.wait_for(fut, _META_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(504, detail="Timed out fetching video metadata.")
+
+async def _get_meta(video_id: str):
+    meta = _meta_cache.get(video_id)
+    if meta is not None:
+        return meta
+    # Per-key lock so concurrent misses for the same video make one call.
+    # The entry is dropped again on every exit path — errors aren't cached,
+    # so failing keys would otherwise pin their lock forever; late waiters
+    # still hold a reference to the old lock object and re-check the cache
+    # on wakeup.
+    try:
+        async with _meta_locks[video_id]:
+            meta = _meta_cache.get(video_id)
+            if meta is None:
+                meta = await _fetch_meta(video_id)
+                _meta_cache[video_id] = meta
+    finally:
+        _meta_locks.pop(video_id, None)
+    return meta
+
 @app.get("/", tags=["Service"])
 def read_root():
     return {"name": "YTLarge-GPT", "version": "1.2.0", "status": "running"}
@@ -24,98 +281,294 @@ def read_root():
 def health_check():
     return {"status": "healthy", "timestamp": datetime.datetime.utcnow().isoformat() + "Z"}
 
-@app.post("/analyze", tags=["Analysis"])
-def analyze(req: AnalyzeRequest):
+@app.post("/analyze", tags=["Analysis"], response_model=AnalyzeResponse)
+async def analyze(req: AnalyzeRequest):
     start = time.time()
-    video_id = str(req.url).split("v=")[-1].split("&")[0]
-    api_key = os.getenv("YOUTUBE_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Missing YouTube API key.")
-    import httpx
-    url = (
-        f"https://www.googleapis.com/youtube/v3/videos"
-        f"?part=snippet,statistics,contentDetails&id={video_id}&key={api_key}"
-    )
-    r = httpx.get(url)
-    if r.status_code != 200:
-        raise HTTPException(400, "Invalid YouTube URL or quota exceeded")
-    data = r.json()
-    if not data["items"]:
-        raise HTTPException(400, "Video not found")
-    item = data["items"][0]
-    meta = {
-        "title": item["snippet"]["title"],
-        "description": item["snippet"].get("description", ""),
-        "duration": item["contentDetails"]["duration"],
-        "view_count": int(item["statistics"].get("viewCount", 0)),
-        "like_count": int(item["statistics"].get("likeCount", 0)),
-        "channel_name": item["snippet"]["channelTitle"],
-        "upload_date": item["snippet"]["publishedAt"][:10],
+    video_id = extract_video_id(str(req.url))
+    meta = await _get_meta(video_id)
+    return {
+        "analysis": "Metadata retrieved successfully",
+        "metadata": meta,
+        "processing_time": round(time.time() - start, 2)
     }
+
+@app.post("/analyze/batch", tags=["Analysis"], response_model=BatchAnalyzeResponse,
+          response_model_exclude_none=True)
+async def analyze_batch(req: BatchAnalyzeRequest):
+    start = time.time()
+
+    async def one(url: str):
+        vid = extract_video_id(url)
+        return vid, await _get_meta(vid)
+
+    results = await asyncio.gather(*(one(str(u)) for u in req.urls), return_exceptions=True)
+    videos = []
+    for url, res in zip(req.urls, results):
+        if isinstance(res, HTTPException):
+            videos.append({"url": str(url), "error": res.detail})
+        elif isinstance(res, Exception):
+            videos.append({"url": str(url), "error": str(res)})
+        else:
+            vid, meta = res
+            videos.append({"video_id": vid, "metadata": meta})
+    return {"videos": videos, "processing_time": round(time.time() - start, 2)}
+
+@app.post("/analyze/full", tags=["Analysis"], response_model=FullAnalyzeResponse,
+          response_model_exclude_none=True)
+async def analyze_full(req: AnalyzeRequest):
+    """Metadata plus transcript in one call.
+
+    The two lookups are independent, so they run concurrently: latency is
+    max(meta, transcript) rather than their sum.
+    """
+    start = time.time()
+    video_id = extract_video_id(str(req.url))
+    meta, transcript = await asyncio.gather(
+        _get_meta(video_id),
+        _get_transcript(video_id, str(req.url)),
+        return_exceptions=True,
+    )
+    if isinstance(meta, HTTPException):
+        raise meta
+    if isinstance(meta, Exception):
+        raise HTTPException(502, detail=str(meta))
+    if isinstance(transcript, Exception):
+        # Metadata alone is still useful; transcript is best-effort here.
+        transcript = None
     return {
         "analysis": "Metadata retrieved successfully",
         "metadata": meta,
+        "transcript": transcript,
         "processing_time": round(time.time() - start, 2)
     }
 
-@app.get("/transcript", tags=["Transcript"])
-def get_transcript(video_url: str = Query(..., description="Full YouTube video URL")):
-    video_id = video_url.split("v=")[-1].split("&")[0]
-    temp_id = str(uuid.uuid4())
-    subtitle_file = f"{temp_id}.en.vtt"
+# Every ffmpeg/yt-dlp job passes through this semaphore, so a burst of
+# /clip or /download traffic can't fork an unbounded number of processes
+# that thrash CPU and disk; excess requests queue instead.
+_DL_SEM = asyncio.Semaphore(max(2, (os.cpu_count() or 2) // 2))
+
+async def _run_cmd(*cmd: str) -> int:
+    """Run a subprocess without blocking the event loop or a threadpool slot."""
+    async with _DL_SEM:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        return await proc.wait()
+
+_MP3_OPTS = {
+    "format": "bestaudio/best",
+    "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3"}],
+}
+
+async def _ydl_download(url: str, opts: dict) -> None:
+    """Download via the in-process yt_dlp API instead of forking the CLI."""
+    def _run():
+        with yt_dlp.YoutubeDL({"quiet": True, "noprogress": True, **opts}) as ydl:
+            ydl.extract_info(url, download=True)
+    async with _DL_SEM:
+        await asyncio.to_thread(_run)
+
+_transcript_api = YouTubeTranscriptApi()
+
+# Transcripts are immutable for a given video, so re-fetching is pure
+# waste: cache them with the same single-flight locking as metadata.
+_transcript_cache = cachetools.TTLCache(maxsize=1024, ttl=86400)
+_transcript_locks = defaultdict(asyncio.Lock)
+
+# Caption text lines: anything that isn't blank, a cue number, or a
+# timestamp line. One findall over the whole file beats per-line checks.
+_VTT_TEXT = re.compile(r"^(?!\d|.*-->)\S.*$", re.M)
+
+async def _fetch_transcript(video_id: str, video_url: str, lang: str = "en") -> list[str]:
+    try:
+        fetched = await asyncio.to_thread(_transcript_api.fetch, video_id, languages=(lang,))
+        return [snippet.text for snippet in fetched]
+    except CouldNotRetrieveTranscript:
+        pass
+    # Fall back to yt-dlp's auto-generated captions when the transcript API
+    # has nothing for this video.
+    temp_id = os.path.join(DOWNLOAD_DIR, str(uuid.uuid4()))
+    subtitle_file = f"{temp_id}.{lang}.vtt"
     try:
-        subprocess.run([
-            "yt-dlp",
-            "--skip-download",
-            "--write-auto-sub",
-            "--sub-lang", "en",
-            "-o", temp_id,
-            video_url
-        ], check=True)
+        try:
+            await _ydl_download(video_url, {
+                "skip_download": True,
+                "writeautomaticsub": True,
+                "subtitleslangs": [lang],
+                "outtmpl": temp_id,
+            })
+        except yt_dlp.utils.DownloadError:
+            raise HTTPException(500, detail="Failed to retrieve transcript using yt-dlp.")
         if not os.path.exists(subtitle_file):
             raise HTTPException(404, detail="Transcript not available.")
         with open(subtitle_file, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if "-->" not in line and line.strip() and not line[0].isdigit()]
-        return {"transcript": lines}
-    except subprocess.CalledProcessError:
-        raise HTTPException(500, detail="Failed to retrieve transcript using yt-dlp.")
+            return _VTT_TEXT.findall(f.read())
     finally:
         if os.path.exists(subtitle_file):
             os.remove(subtitle_file)
 
+async def _get_transcript(video_id: str, video_url: str, lang: str = "en") -> list[str]:
+    key = (video_id, lang)
+    lines = _transcript_cache.get(key)
+    if lines is None:
+        try:
+            async with _transcript_locks[key]:
+                lines = _transcript_cache.get(key)
+                if lines is None:
+                    lines = await _fetch_transcript(video_id, video_url, lang)
+                    _transcript_cache[key] = lines
+        finally:
+            _transcript_locks.pop(key, None)
+    return lines
+
+@app.get("/transcript", tags=["Transcript"])
+async def get_transcript(video_url: str = Query(..., description="Full YouTube video URL")):
+    video_id = extract_video_id(video_url)
+    return {"transcript": await _get_transcript(video_id, video_url)}
+
 @app.get("/mp3", tags=["Audio"])
-def convert_to_mp3(video_url: str):
-    filename = f"{uuid.uuid4()}.mp3"
+async def convert_to_mp3(video_url: str):
+    temp_id = os.path.join(DOWNLOAD_DIR, str(uuid.uuid4()))
+    filename = f"{temp_id}.mp3"
     try:
-        subprocess.run([
-            "yt-dlp",
-            "-x", "--audio-format", "mp3",
-            "-o", filename,
-            video_url
-        ], check=True)
-        if not os.path.exists(filename):
-            raise HTTPException(500, detail="MP3 conversion failed.")
-        return {"filename": filename}
-    finally:
-        if os.path.exists(filename):
-            os.remove(filename)
+        await _ydl_download(video_url, {"outtmpl": f"{temp_id}.%(ext)s", **_MP3_OPTS})
+    except yt_dlp.utils.DownloadError:
+        raise HTTPException(500, detail="MP3 conversion failed.")
+    if not os.path.exists(filename):
+        raise HTTPException(500, detail="MP3 conversion failed.")
+    return FileResponse(
+        filename,
+        media_type="audio/mpeg",
+        filename="audio.mp3",
+        stat_result=os.stat(filename),
+        background=BackgroundTask(_cleanup_files, [filename]),
+    )
 
-@app.get("/download", tags=["Download"])
-def download(video_url: str, audio_only: bool = False):
+# Concurrent /download calls for the same URL would run yt-dlp twice for
+# the same bytes. The first caller becomes the leader and parks a Future;
+# followers await it and share the leader's file. The file is refcounted
+# so it survives until the last response that uses it has been sent.
+_inflight_downloads: dict[str, asyncio.Future] = {}
+_download_refs = defaultdict(int)
+
+def _release_download(path: str):
+    _download_refs[path] -= 1
+    if _download_refs[path] <= 0:
+        del _download_refs[path]
+        _cleanup_files([path])
+
+async def _do_download(video_url: str, audio_only: bool) -> str:
+    temp_id = os.path.join(DOWNLOAD_DIR, str(uuid.uuid4()))
     ext = "mp3" if audio_only else "mp4"
-    filename = f"{uuid.uuid4()}.{ext}"
-    cmd = [
-        "yt-dlp",
-        "-o", filename,
-    ]
+    filename = f"{temp_id}.{ext}"
+    opts = {"outtmpl": f"{temp_id}.%(ext)s"}
     if audio_only:
-        cmd += ["-x", "--audio-format", "mp3"]
-    cmd.append(video_url)
+        opts.update(_MP3_OPTS)
+    else:
+        opts["format"] = "mp4"
     try:
-        subprocess.run(cmd, check=True)
-        if not os.path.exists(filename):
-            raise HTTPException(500, detail="Download failed.")
-        return {"filename": filename}
-    finally:
-        if os.path.exists(filename):
-            os.remove(filename)
+        await _ydl_download(video_url, opts)
+    except yt_dlp.utils.DownloadError:
+        raise HTTPException(500, detail="Download failed.")
+    if not os.path.exists(filename):
+        raise HTTPException(500, detail="Download failed.")
+    return filename
+
+@app.get("/download", tags=["Download"])
+async def download(video_url: str, audio_only: bool = False):
+    key = hashlib.sha1(f"{audio_only}:{video_url}".encode()).hexdigest()
+    fut = _inflight_downloads.get(key)
+    if fut is None:
+        fut = asyncio.get_running_loop().create_future()
+        _inflight_downloads[key] = fut
+        try:
+            filename = await _do_download(video_url, audio_only)
+        except asyncio.CancelledError:
+            # The leader's client disconnected; don't propagate the
+            # cancellation into followers' requests — fail them with a
+            # retryable 503 instead.
+            fut.set_exception(HTTPException(503, detail="Download was canceled upstream; retry."))
+            fut.exception()  # mark retrieved in case nobody is waiting
+            raise
+        except BaseException as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark retrieved in case nobody is waiting
+            raise
+        finally:
+            _inflight_downloads.pop(key, None)
+        fut.set_result(filename)
+    else:
+        filename = await fut
+    ext = "mp3" if audio_only else "mp4"
+    # Followers woken by set_result take their ref before the leader's
+    # response body starts streaming, so the file can't be unlinked early.
+    _download_refs[filename] += 1
+    return FileResponse(
+        filename,
+        media_type="audio/mpeg" if audio_only else "video/mp4",
+        filename=f"{'audio' if audio_only else 'video'}.{ext}",
+        stat_result=os.stat(filename),
+        background=BackgroundTask(_release_download, filename),
+    )
+
+@app.post("/clip", tags=["Clips"])
+async def create_clip(req: ClipRequest):
+    if not req.segments:
+        raise HTTPException(400, detail="At least one segment is required.")
+    # Reject nonsense ranges before paying for the source download.
+    for seg in req.segments:
+        if seg.start < 0 or seg.end <= seg.start:
+            raise HTTPException(400, detail="Segment start must be >= 0 and end greater than start.")
+    job_id = str(uuid.uuid4())
+    input_file = os.path.join(DOWNLOAD_DIR, f"{job_id}.mp4")
+    try:
+        await _ydl_download(str(req.url), {"format": "mp4", "outtmpl": input_file})
+    except yt_dlp.utils.DownloadError:
+        raise HTTPException(500, detail="Clip source download failed.")
+    if not os.path.exists(input_file):
+        raise HTTPException(500, detail="Clip source download failed.")
+    # Segments are independent stream copies, so cut them all in parallel;
+    # -ss before -i seeks via the demuxer index instead of decoding from 0.
+    clip_paths = [
+        os.path.join(DOWNLOAD_DIR, f"{job_id}_{i}.mp4")
+        for i in range(len(req.segments))
+    ]
+    rcs = await asyncio.gather(*[
+        _run_cmd(
+            "ffmpeg", "-y",
+            "-ss", str(seg.start), "-t", str(seg.end - seg.start),
+            "-i", input_file,
+            "-c", "copy", path
+        )
+        for seg, path in zip(req.segments, clip_paths)
+    ])
+    artifacts = [input_file, *clip_paths]
+    if any(rc != 0 for rc in rcs) or not all(os.path.exists(p) for p in clip_paths):
+        _cleanup_files(artifacts)
+        raise HTTPException(500, detail="Clip segment extraction failed.")
+    if len(clip_paths) == 1:
+        final = clip_paths[0]
+    else:
+        list_file = os.path.join(DOWNLOAD_DIR, f"{job_id}.txt")
+        # One pre-joined write instead of a syscall per segment.
+        data = "".join(f"file '{os.path.basename(p)}'\n" for p in clip_paths).encode()
+        with open(list_file, "wb") as f:
+            f.write(data)
+        final = os.path.join(DOWNLOAD_DIR, f"{job_id}_final.mp4")
+        artifacts += [list_file, final]
+        rc = await _run_cmd(
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+            "-i", list_file, "-c", "copy", final
+        )
+        if rc != 0 or not os.path.exists(final):
+            _cleanup_files(artifacts)
+            raise HTTPException(500, detail="Clip concatenation failed.")
+    return FileResponse(
+        final,
+        media_type="video/mp4",
+        filename="clip.mp4",
+        stat_result=os.stat(final),
+        background=BackgroundTask(_cleanup_files, artifacts),
+    )